@@ -58,7 +58,7 @@ export default function ResumeAnalyzer({ preloadedResult }) {
           match_score: analysisData.final_score || breakdown.match_score || 0,
           breakdown: breakdown,
           extracted_skills: analysisData.parsed_resume?.skills || [],
-          missing_skills: [],
+          missing_skills: analysisData.missing_skills || [],
           suggestions: analysisData.suggestions || [],
         },
       ]);
@@ -1,27 +1,41 @@
 ﻿# backend/app/core/scoring.py
+from pathlib import Path
 from typing import List, Dict, Set
+import json
 import re
 
-# Basic skill list - expand later or load from file
+# skill taxonomy shared with scorer.skill_matching (which also embeds it)
+SKILLS_FILE = Path(__file__).resolve().parents[1] / "data" / "skills.json"
+
+def _load_skill_file() -> Set[str]:
+    try:
+        with open(SKILLS_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return set()
+    names = [item.get("skill") if isinstance(item, dict) else item for item in data]
+    return {n.strip().lower() for n in names if isinstance(n, str) and n.strip()}
+
+# Basic skill list, extended with data/skills.json
 BASE_SKILLS = {
     "python","java","c","c++","javascript","sql","aws","docker","kubernetes",
     "pandas","numpy","scikit-learn","tensorflow","pytorch","nlp","git","html","css",
     "react","node","fastapi","flask","rest","api","linux","bash"
-}
+} | _load_skill_file()
 
 def normalize_text(s: str) -> str:
     return re.sub(r'[^a-z0-9\s\+\#]', ' ', s.lower() or '')
 
 def extract_skills_from_text(text: str, skill_set: Set[str]=None) -> List[str]:
     skill_set = skill_set or BASE_SKILLS
-    t = normalize_text(text)
-    tokens = set(t.split())
+    t = " " + " ".join(normalize_text(text).split()) + " "
     found = []
-    # simple exact match first
+    # whole-token / whole-phrase match; skills get the same normalization as the
+    # text, so "machine learning", "ci/cd" and "scikit-learn" match too
     for sk in skill_set:
-        if sk in tokens:
+        phrase = " ".join(normalize_text(sk).split())
+        if phrase and " " + phrase + " " in t:
             found.append(sk)
-    # try multi-word skills (pandas, scikit-learn already single tokens after normalize)
     # Avoid duplicates
     return sorted(set(found))
 
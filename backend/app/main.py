@@ -5,9 +5,15 @@ FastAPI entrypoint for the AI Resume Analyzer backend.
 
 Endpoints:
 - GET /               -> basic health / landing
-- POST /analyze_with_jd  -> accept resume file + optional JD text, returns analysis JSON
+- POST /jds              -> register a job description once, returns its jd_id
+- GET /jds/{jd_id}       -> summary of a registered job description
+- POST /analyze_with_jd  -> accept resume file + optional JD text or jd_id, returns analysis JSON
+- GET /analyses          -> query stored analysis history (skill / score / date filters)
+- GET /analyses/{id}     -> one stored analysis (without resume text)
 
 Notes:
+- Set SAVE_ANALYSES=1 to append analyses to a local SQLite history store
+  (backend/app/storage/analysis_store.py). Off by default: the store keeps resume text.
 - CORS origins: set env var FRONTEND_URL to your frontend origin (e.g. https://ai-resume-analyzer-1-3kh7.onrender.com)
   If FRONTEND_URL is not set, the code will allow all origins ("*") for easier testing.
 """
@@ -16,25 +22,63 @@ import os
 import shutil
 import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, PlainTextResponse
 
-# import the scoring pipeline (ensure the module path matches your repo layout)
-# the scoring_model should expose `build_enhanced_features(resume_path, jd_text, skill_list)`
+# import the analysis pipeline (ensure the module path matches your repo layout)
+# the pipeline should expose `run_analysis(resume_path, jd_text, jd, skill_list, profile, parse_timeout)`
 try:
-    from app.scorer.scoring_model import build_enhanced_features
+    from app.pipeline.stages import FAST, PROFILES, run_analysis
+    from app.scorer.jd_registry import (
+        describe_job_description,
+        get_job_description,
+        register_job_description,
+    )
 except Exception:
-    # fallback: try backend.app.scorer
+    # fallback: try backend.app.pipeline
     try:
-        from backend.app.scorer.scoring_model import build_enhanced_features
+        from backend.app.pipeline.stages import FAST, PROFILES, run_analysis
+        from backend.app.scorer.jd_registry import (
+            describe_job_description,
+            get_job_description,
+            register_job_description,
+        )
     except Exception as e:
         # If this import fails on startup, we still create the app but raise on call.
-        build_enhanced_features = None
+        run_analysis = None
         _import_err = e
 
+# upload guardrails (size / page / zip-bomb checks, parse time budget)
+try:
+    from app.parser.guardrails import (
+        MAX_UPLOAD_BYTES,
+        PARSE_TIMEOUT_SECONDS,
+        ParseTimeout,
+        UploadRejected,
+        preflight_check,
+    )
+except Exception:
+    from backend.app.parser.guardrails import (
+        MAX_UPLOAD_BYTES,
+        PARSE_TIMEOUT_SECONDS,
+        ParseTimeout,
+        UploadRejected,
+        preflight_check,
+    )
+
+# analysis history store (optional: analysis still works without it)
+try:
+    from app.storage.analysis_store import get_analysis, query_analyses, save_analysis
+except Exception:
+    try:
+        from backend.app.storage.analysis_store import get_analysis, query_analyses, save_analysis
+    except Exception as e:
+        save_analysis = None
+        _store_import_err = e
+
 app = FastAPI(title="AI Resume Analyzer", version="0.1")
 
 # ---------------------
@@ -48,6 +92,69 @@ else:
     # WARNING: wildcard is permissive. Use only for quick testing.
     allowed_origins = ["*"]
 
+# ---------------------
+# Request body size limit
+# ---------------------
+# Starlette spools the whole multipart body before the endpoint runs, so the
+# upload limit has to be enforced here: from Content-Length when present,
+# otherwise by counting body bytes as they arrive.
+# Headroom over MAX_UPLOAD_BYTES for the other form fields (jd_text etc.).
+MAX_REQUEST_BYTES = MAX_UPLOAD_BYTES + 1024 * 1024
+
+class _BodyTooLarge(Exception):
+    pass
+
+class BodySizeLimitMiddleware:
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        too_large = JSONResponse(
+            {"detail": f"request too large (limit {self.max_bytes // (1024 * 1024)} MB)"}, status_code=413
+        )
+        length = dict(scope.get("headers") or []).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if exceeded:
+                # the app may turn the aborted read into its own error response; replace it
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not started:
+            await too_large(scope, receive, send)
+
+app.add_middleware(BodySizeLimitMiddleware, max_bytes=MAX_REQUEST_BYTES)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -59,95 +166,136 @@ app.add_middleware(
 # ---------------------
 # Helpers
 # ---------------------
-def _save_upload_to_temp(file: UploadFile) -> str:
+def _save_upload_to_temp(file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> str:
     """
     Save an UploadFile to a temporary file and return the path.
     Caller should remove the file after use.
+    Raises HTTP 413 if the file is larger than max_bytes (the request body itself
+    is already bounded by BodySizeLimitMiddleware).
     """
     # create temporary file in system temp
     suffix = Path(file.filename).suffix or ""
     fd, tmp_path = tempfile.mkstemp(suffix=suffix)
     os.close(fd)
-    with open(tmp_path, "wb") as out_f:
-        # stream chunks
-        while True:
-            chunk = file.file.read(1024 * 1024)
-            if not chunk:
-                break
-            out_f.write(chunk)
+    written = 0
+    try:
+        with open(tmp_path, "wb") as out_f:
+            # stream chunks
+            while True:
+                chunk = file.file.read(1024 * 1024)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"file too large (limit {max_bytes // (1024 * 1024)} MB)",
+                    )
+                out_f.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
     return tmp_path
 
 # ---------------------
 # Routes
 # ---------------------
+# Endpoints that parse, embed or wait on the parse subprocess are plain `def`:
+# FastAPI runs them in its threadpool, so a slow upload (up to PARSE_TIMEOUT_SECONDS)
+# does not stall the event loop for every other request.
 @app.get("/", response_class=PlainTextResponse)
 async def root():
     return "AI Resume Analyzer backend is up. See /docs for API."
 
+@app.post("/jds")
+def register_jd(jd_text: str = Form(...)):
+    """
+    Register a job description once. Its normalized text, skills and embeddings
+    are precomputed and stored; pass the returned jd_id to /analyze_with_jd.
+    """
+    if run_analysis is None:
+        raise HTTPException(status_code=500, detail=f"scoring pipeline not available: {_import_err}")
+    if not jd_text or not jd_text.strip():
+        raise HTTPException(status_code=400, detail="jd_text must not be empty")
+
+    try:
+        record = register_job_description(jd_text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"jd registration failed: {str(e)}")
+    return describe_job_description(record)
+
+@app.get("/jds/{jd_id}")
+def get_jd(jd_id: str):
+    if run_analysis is None:
+        raise HTTPException(status_code=500, detail=f"scoring pipeline not available: {_import_err}")
+    record = get_job_description(jd_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"unknown jd_id: {jd_id}")
+    return describe_job_description(record)
+
 @app.post("/analyze_with_jd")
-async def analyze_with_jd(
+def analyze_with_jd(
     file: UploadFile = File(...),
     jd_text: Optional[str] = Form(None),
+    jd_id: Optional[str] = Form(None),
+    profile: str = Form("full"),
 ):
     """
     Accepts:
       - file: resume file (pdf/docx)
       - jd_text: optional job description text
+      - jd_id: optional id of a JD registered via POST /jds (takes precedence over jd_text)
+      - profile: "full" (default) or "fast" (skips grammar check and resume embeddings)
 
     Returns:
-      JSON with parsed resume, quality, semantic, and features_enhanced (whatever scoring_model returns)
+      JSON with parsed resume, quality, semantic, skill gap, final score, breakdown and suggestions
+      (see app/pipeline/stages.py::run_analysis)
     """
     # ensure scoring function available
-    if build_enhanced_features is None:
+    if run_analysis is None:
         # import error details may be in _import_err
         raise HTTPException(status_code=500, detail=f"scoring pipeline not available: {_import_err}")
 
+    if profile not in PROFILES:
+        raise HTTPException(status_code=400, detail=f"profile must be one of: {', '.join(PROFILES)}")
+
+    jd = None
+    if jd_id:
+        # fast never uses JD embeddings, so don't refresh stale ones (that loads the model)
+        jd = get_job_description(jd_id, embed=profile != FAST)
+        if jd is None:
+            raise HTTPException(status_code=404, detail=f"unknown jd_id: {jd_id}")
+
     tmp_path = None
     try:
         tmp_path = _save_upload_to_temp(file)
-        # call scoring pipeline (this may take time - keep logs)
-        # build_enhanced_features expects path to resume, jd_text and optional skill_list
-        result = build_enhanced_features(tmp_path, jd_text or "", skill_list=[])
-
-        # Calculate final score based on semantic similarity and quality
-        semantic_score = result.get("semantic", {}).get("overall_similarity", 0.0)
-        quality_data = result.get("quality", {})
-        grammar_issues = quality_data.get("total_issues_count", 0)
-
-        # Convert semantic similarity (0-1) to 0-100 scale
-        semantic_score_100 = int(semantic_score * 100)
-
-        # Grammar score: reduce by 2 points per issue, min 0
-        grammar_penalty = min(grammar_issues * 2, 50)
-        grammar_score = max(0, 100 - grammar_penalty)
-
-        # Final score weighted average: 70% semantic, 30% grammar
-        final_score = int((semantic_score_100 * 0.7) + (grammar_score * 0.3))
-
-        # Generate suggestions based on analysis
-        suggestions = []
-        if grammar_issues > 5:
-            suggestions.append(f"Fix {grammar_issues} grammar and spelling issues to improve professionalism")
-        if semantic_score < 0.3:
-            suggestions.append("Add more relevant keywords from the job description")
-        if semantic_score < 0.5:
-            suggestions.append("Expand on relevant experience and skills that match the job requirements")
-        if len(result.get("parsed_resume", {}).get("text", "")) < 500:
-            suggestions.append("Consider adding more detail to your resume")
-
-        # Add final score and suggestions to result
-        result["final_score"] = final_score
-        result["suggestions"] = suggestions
-        result["breakdown"] = {
-            "semantic_score": semantic_score_100,
-            "grammar_score": grammar_score,
-            "match_score": final_score
-        }
+        # reject pathological files before any expensive parsing
+        preflight_check(tmp_path)
+        # run the analysis pipeline (this may take time - keep logs)
+        result = run_analysis(
+            tmp_path,
+            jd_text=jd_text or "",
+            jd=jd,
+            profile=profile,
+            parse_timeout=PARSE_TIMEOUT_SECONDS,
+        )
+
+        result["analysis_id"] = None
+        if save_analysis is not None and os.getenv("SAVE_ANALYSES", "0") == "1":
+            try:
+                result["analysis_id"] = save_analysis(result, filename=file.filename)
+            except Exception:
+                # history is best-effort; never fail the analysis because of it
+                pass
 
         return JSONResponse(content=result)
     except HTTPException:
         # re-raise HTTPExceptions as-is
         raise
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except ParseTimeout as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         # include message for debugging
         raise HTTPException(status_code=500, detail=f"analysis failed: {str(e)}")
@@ -159,6 +307,51 @@ async def analyze_with_jd(
         except Exception:
             pass
 
+@app.get("/analyses")
+async def list_analyses(
+    skill: Optional[List[str]] = Query(None),
+    matched_skill: Optional[List[str]] = Query(None),
+    missing_skill: Optional[List[str]] = Query(None),
+    profile: Optional[str] = None,
+    min_score: Optional[int] = None,
+    max_score: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Query analysis history, best score first.
+    e.g. /analyses?skill=python&profile=full&min_score=71&limit=50
+    fast and full scores are on different scales; filter by profile to rank them.
+    """
+    if save_analysis is None:
+        raise HTTPException(status_code=500, detail=f"analysis store not available: {_store_import_err}")
+    if profile is not None and run_analysis is not None and profile not in PROFILES:
+        raise HTTPException(status_code=400, detail=f"profile must be one of: {', '.join(PROFILES)}")
+    return query_analyses(
+        skills=skill,
+        matched_skills=matched_skill,
+        missing_skills=missing_skill,
+        profile=profile,
+        min_score=min_score,
+        max_score=max_score,
+        since=since,
+        until=until,
+        limit=limit,
+        offset=offset,
+    )
+
+@app.get("/analyses/{analysis_id}")
+async def read_analysis(analysis_id: str):
+    if save_analysis is None:
+        raise HTTPException(status_code=500, detail=f"analysis store not available: {_store_import_err}")
+    # resume text stays server-side: these read endpoints are not authenticated
+    record = get_analysis(analysis_id, include_text=False)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"unknown analysis id: {analysis_id}")
+    return record
+
 # ---------------------
 # Optional: simple health endpoint that returns JSON
 # ---------------------
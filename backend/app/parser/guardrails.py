@@ -0,0 +1,228 @@
+# backend/app/parser/guardrails.py
+"""
+Cheap pre-flight checks for uploaded resumes, run before any expensive parsing.
+
+A 50 MB scanned PDF or a zip-bomb DOCX can keep pdfminer / python-docx busy
+for minutes. This module rejects such files up front and bounds the parse
+itself by wall-clock time:
+
+    preflight_check(file_path)                      -> raises UploadRejected
+    run_with_timeout(func, args, kwargs, timeout)   -> raises ParseTimeout
+
+Limits (env vars):
+    MAX_UPLOAD_MB          upload size (default 10); main.py also rejects larger
+                           request bodies from Content-Length / bytes received
+    MAX_PDF_PAGES          pages per PDF (default 30); counted from page
+                           dictionaries in the raw file and in (flate) object
+                           streams. If no count can be found it is treated as
+                           unknown and left to the parse timeout.
+    MAX_PDF_OBJECTS        objects per PDF, from the trailer /Size (default 20000)
+    MAX_DOCX_UNCOMPRESSED_MB  total uncompressed size of .docx/.doc (or any zip) uploads (default 30)
+    PARSE_TIMEOUT_SECONDS  wall-clock budget per parse run (default 20)
+"""
+
+import multiprocessing
+import os
+import re
+import zipfile
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "30"))
+MAX_PDF_OBJECTS = int(os.getenv("MAX_PDF_OBJECTS", "20000"))
+MAX_DOCX_UNCOMPRESSED_BYTES = int(float(os.getenv("MAX_DOCX_UNCOMPRESSED_MB", "30")) * 1024 * 1024)
+MAX_DOCX_ENTRIES = 1000
+# per-entry compression ratio above which a (large) member looks like a zip bomb
+MAX_DOCX_RATIO = 100
+PARSE_TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", "20"))
+
+
+class UploadRejected(ValueError):
+    """Uploaded file failed a pre-flight check. status_code is the HTTP status to report."""
+
+    def __init__(self, message: str, status_code: int = 422):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ParseTimeout(TimeoutError):
+    """Parsing did not finish within its wall-clock budget and was killed."""
+
+
+# -------------------------
+# Pre-flight checks
+# -------------------------
+_PDF_PAGE_RE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_PDF_COUNT_RE = re.compile(rb"/Count\s+(\d+)")
+_PDF_SIZE_RE = re.compile(rb"/Size\s+(\d+)")
+_PDF_STREAM_RE = re.compile(rb"stream\r?\n")
+# budget for inflating object streams while counting pages
+MAX_PDF_INFLATE_BYTES = 64 * 1024 * 1024
+_ZIP_MAGIC = b"PK\x03\x04"
+
+
+def _pdf_object_streams(data: bytes):
+    """
+    Yield the inflated contents of flate-compressed object streams (/Type /ObjStm),
+    where modern PDFs keep their page dictionaries. Total output is capped by
+    MAX_PDF_INFLATE_BYTES so a deflate bomb cannot blow up the check itself.
+    """
+    budget = MAX_PDF_INFLATE_BYTES
+    for m in _PDF_STREAM_RE.finditer(data):
+        start = m.end()
+        head = data[max(0, m.start() - 1024):m.start()]
+        head = head[head.rfind(b" obj"):] if b" obj" in head else head
+        if b"/ObjStm" not in head or b"/FlateDecode" not in head:
+            continue
+        end = data.find(b"endstream", start)
+        if end < 0:
+            continue
+        try:
+            out = zlib.decompressobj().decompress(data[start:end], budget)
+        except zlib.error:
+            continue
+        budget -= len(out)
+        yield out
+        if budget <= 0:
+            return
+
+
+def _check_pdf(file_path: str) -> Dict[str, Any]:
+    # file size is already bounded by MAX_UPLOAD_BYTES, so scanning the raw bytes is cheap
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    if b"%PDF-" not in data[:1024]:
+        raise UploadRejected("file is not a valid PDF")
+
+    # trailer / xref stream /Size = number of objects (take the max over incremental updates)
+    sizes = [int(m) for m in _PDF_SIZE_RE.findall(data)]
+    objects = max(sizes) if sizes else 0
+    if objects > MAX_PDF_OBJECTS:
+        raise UploadRejected(f"PDF has too many objects ({objects} > {MAX_PDF_OBJECTS})", 413)
+
+    # page dictionaries, raw and inside object streams; fall back to the page tree /Count.
+    # 0 means "unknown" (e.g. non-flate object streams) - the parse timeout still applies
+    pages = len(_PDF_PAGE_RE.findall(data))
+    counts = [int(m) for m in _PDF_COUNT_RE.findall(data)]
+    for content in _pdf_object_streams(data):
+        pages += len(_PDF_PAGE_RE.findall(content))
+        counts += [int(m) for m in _PDF_COUNT_RE.findall(content)]
+    if pages == 0:
+        pages = max(counts) if counts else 0
+    if pages > MAX_PDF_PAGES:
+        raise UploadRejected(f"PDF has too many pages ({pages} > {MAX_PDF_PAGES})", 413)
+
+    return {"pages": pages, "objects": objects}
+
+
+def _check_docx(file_path: str) -> Dict[str, Any]:
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            infos = zf.infolist()
+    except zipfile.BadZipFile:
+        raise UploadRejected("file is not a valid DOCX")
+
+    if len(infos) > MAX_DOCX_ENTRIES:
+        raise UploadRejected(f"DOCX has too many parts ({len(infos)} > {MAX_DOCX_ENTRIES})", 413)
+
+    total = 0
+    for info in infos:
+        total += info.file_size
+        if info.file_size > 1024 * 1024 and info.file_size > MAX_DOCX_RATIO * max(1, info.compress_size):
+            raise UploadRejected(f"DOCX part {info.filename} has a suspicious compression ratio", 413)
+    if total > MAX_DOCX_UNCOMPRESSED_BYTES:
+        raise UploadRejected(
+            f"DOCX is too large when uncompressed ({total // (1024 * 1024)} MB)", 413
+        )
+
+    return {"parts": len(infos), "uncompressed_bytes": total}
+
+
+def preflight_check(file_path: str) -> Dict[str, Any]:
+    """
+    Validate a saved upload without parsing it. Returns basic stats,
+    raises UploadRejected for pathological files.
+    """
+    size = os.path.getsize(file_path)
+    if size > MAX_UPLOAD_BYTES:
+        raise UploadRejected(f"file too large ({size} bytes > {MAX_UPLOAD_BYTES})", 413)
+
+    with open(file_path, "rb") as f:
+        magic = f.read(4)
+
+    path_lower = file_path.lower()
+    stats: Dict[str, Any] = {"size": size}
+    if path_lower.endswith(".pdf"):
+        stats.update(_check_pdf(file_path))
+    elif path_lower.endswith(".docx") or magic == _ZIP_MAGIC:
+        # python-docx also opens .doc uploads, so check any zip container by content
+        stats.update(_check_docx(file_path))
+    return stats
+
+
+# -------------------------
+# Time-bounded execution
+# -------------------------
+def _child(conn, func, args, kwargs):
+    try:
+        conn.send((True, func(*args, **kwargs)))
+    except BaseException as e:
+        conn.send((False, repr(e)))
+    finally:
+        conn.close()
+
+
+_preloaded = set()
+
+
+def _mp_context(func: Callable):
+    """
+    Never plain fork: callers run in pipeline worker threads while other threads
+    (e.g. torch encoding) hold locks, and a forked child could deadlock on them.
+    forkserver forks from a clean single-threaded server that preloads the
+    parser module, so each child starts fast; spawn where it is unavailable.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    ctx = multiprocessing.get_context("forkserver")
+    modules = {__name__, getattr(func, "__module__", None)} - {None, "__main__"}
+    if not modules <= _preloaded:
+        # only takes effect before the server starts (first call), which is the point
+        _preloaded.update(modules)
+        ctx.set_forkserver_preload(sorted(_preloaded))
+    return ctx
+
+
+def run_with_timeout(
+    func: Callable,
+    args: Tuple = (),
+    kwargs: Optional[Dict[str, Any]] = None,
+    timeout: float = PARSE_TIMEOUT_SECONDS,
+):
+    """
+    Run func(*args, **kwargs) in a child process and return its result.
+    The child is killed if it does not finish within `timeout` seconds.
+    """
+    ctx = _mp_context(func)
+    recv_conn, send_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_child, args=(send_conn, func, args, kwargs or {}), daemon=True)
+    proc.start()
+    send_conn.close()
+    try:
+        if not recv_conn.poll(timeout):
+            raise ParseTimeout(f"parsing exceeded {timeout:g}s and was aborted")
+        try:
+            ok, payload = recv_conn.recv()
+        except EOFError:
+            raise RuntimeError(f"parser process exited unexpectedly (exit code {proc.exitcode})")
+    finally:
+        recv_conn.close()
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+
+    if not ok:
+        raise RuntimeError(f"parsing failed: {payload}")
+    return payload
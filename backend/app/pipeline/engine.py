@@ -0,0 +1,123 @@
+# backend/app/pipeline/engine.py
+"""
+Minimal stage-graph pipeline engine.
+
+A Stage declares the context keys it reads (inputs / optional_inputs) and the
+keys it produces (outputs), plus the request profiles it belongs to.
+Pipeline.run(context, profile):
+- keeps only the stages enabled for the profile
+- checks that every required input is provided by the caller or by an
+  earlier stage (raises PipelineError otherwise)
+- runs each stage as soon as its inputs are ready; independent stages
+  (e.g. grammar check and embeddings) run concurrently in a thread pool
+- returns the context with all outputs plus per-stage timings under "timings"
+
+Stage functions take a dict with the declared inputs and return a dict with
+the declared outputs.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class PipelineError(RuntimeError):
+    """Pipeline is misconfigured (unknown profile, unsatisfiable inputs, missing outputs)."""
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Dict[str, Any]], Dict[str, Any]],
+        inputs: Iterable[str] = (),
+        outputs: Iterable[str] = (),
+        optional_inputs: Iterable[str] = (),
+        profiles: Optional[Iterable[str]] = None,
+    ):
+        """
+        optional_inputs: read if some enabled stage (or the caller) provides them;
+        the stage then waits for them, otherwise it runs without.
+        profiles: profiles this stage runs in (None = all).
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.optional_inputs = tuple(optional_inputs)
+        self.profiles = set(profiles) if profiles is not None else None
+
+    def enabled_for(self, profile: str) -> bool:
+        return self.profiles is None or profile in self.profiles
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+class Pipeline:
+    def __init__(self, stages: List[Stage], profiles: Iterable[str], max_workers: int = 4):
+        self.stages = list(stages)
+        self.profiles = tuple(profiles)
+        self.max_workers = max_workers
+
+        producers: Dict[str, str] = {}
+        for stage in self.stages:
+            for key in stage.outputs:
+                if key in producers:
+                    raise PipelineError(f"{key!r} is produced by both {producers[key]} and {stage.name}")
+                producers[key] = stage.name
+
+    def plan(self, profile: str, provided: Iterable[str]) -> List[Stage]:
+        """
+        Stages enabled for `profile`, validated against the caller-provided keys.
+        """
+        if profile not in self.profiles:
+            raise PipelineError(f"unknown profile {profile!r} (expected one of {', '.join(self.profiles)})")
+        stages = [s for s in self.stages if s.enabled_for(profile)]
+        available = set(provided)
+        for s in stages:
+            available.update(s.outputs)
+        for s in stages:
+            missing = [k for k in s.inputs if k not in available]
+            if missing:
+                raise PipelineError(f"stage {s.name} needs {', '.join(missing)} (profile {profile!r})")
+        return stages
+
+    def run(self, context: Dict[str, Any], profile: str) -> Dict[str, Any]:
+        ctx = dict(context)
+        pending = self.plan(profile, ctx.keys())
+        produced_later = {k for s in pending for k in s.outputs}
+        timings: Dict[str, float] = {}
+
+        def needs(stage: Stage) -> List[str]:
+            optional = [k for k in stage.optional_inputs if k in produced_later or k in ctx]
+            return list(stage.inputs) + optional
+
+        def call(stage: Stage):
+            start = time.perf_counter()
+            args = {k: ctx.get(k) for k in needs(stage)}
+            out = stage.func(args) or {}
+            missing = [k for k in stage.outputs if k not in out]
+            if missing:
+                raise PipelineError(f"stage {stage.name} did not produce {', '.join(missing)}")
+            return out, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while pending or running:
+                ready = [s for s in pending if all(k in ctx for k in needs(s))]
+                for s in ready:
+                    pending.remove(s)
+                    running[pool.submit(call, s)] = s
+                if not running:
+                    # plan() guarantees inputs exist, so this only happens on a cycle
+                    raise PipelineError(f"stages cannot be scheduled: {', '.join(s.name for s in pending)}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    stage = running.pop(fut)
+                    out, elapsed = fut.result()
+                    ctx.update({k: out[k] for k in stage.outputs})
+                    timings[stage.name] = round(elapsed * 1000, 1)
+
+        ctx["timings"] = timings
+        return ctx
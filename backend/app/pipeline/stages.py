@@ -0,0 +1,251 @@
+# backend/app/pipeline/stages.py
+"""
+The resume analysis pipeline: one engine for extraction, skill detection,
+quality, semantic similarity and scoring.
+
+Stage graph (-> = data dependency):
+
+    resume_path -> extract --+--> skills ---+
+                             +--> quality --+--> scoring
+    jd / jd_text -> jd ------+--> semantic -+
+
+extract and jd run concurrently, as do quality (LanguageTool) and semantic
+(embeddings). Profiles:
+    fast  - extract, jd, skills, scoring. No embedding model at all: the JD is not
+            embedded, the skill gap uses whole-token literal matches only, and the
+            score is the keyword/heuristic score from core.scoring (no grammar check)
+    full  - everything; semantic skill gap; final score = 70% semantic similarity + 30% grammar
+
+Entry point: run_analysis(resume_path, jd_text=..., jd=..., profile="full")
+"""
+
+from typing import Dict, Any, List, Optional
+
+from .engine import Pipeline, Stage
+from ..core.scoring import calculate_scores, extract_skills_from_text
+from ..scorer import scoring_model
+from ..scorer.jd_registry import preprocess_job_description
+from ..scorer.skill_matching import find_literal_skills, literal_skill_gap, semantic_skill_gap
+
+FAST = "fast"
+FULL = "full"
+PROFILES = (FAST, FULL)
+
+
+# -------------------------
+# Stages
+# -------------------------
+def _extract(inp: Dict[str, Any]) -> Dict[str, Any]:
+    parse_resume_file = scoring_model.parse_resume_file
+    if parse_resume_file is None:
+        raise ImportError(f"parse_resume_file not found. Details: {scoring_model._parser_import_error}")
+    # skills are detected in the skills stage, so parsing doesn't wait for the JD
+    if inp.get("parse_timeout"):
+        from ..parser.guardrails import run_with_timeout
+        parsed = run_with_timeout(parse_resume_file, (inp["resume_path"],), timeout=inp["parse_timeout"])
+    else:
+        parsed = parse_resume_file(inp["resume_path"])
+    return {"parsed": parsed}
+
+
+def _job_description(inp: Dict[str, Any]) -> Dict[str, Any]:
+    jd = inp.get("jd")
+    if jd is None and (inp.get("jd_text") or "").strip():
+        # one-off JD: same preprocessing as registered JDs, just not stored.
+        # Only the whole-JD embedding is read (semantic stage), and the fast
+        # profile reads none, so section / chunk embeddings are skipped
+        jd = preprocess_job_description(inp["jd_text"], embed=inp["profile"] != FAST, embed_parts=False)
+    return {"job_description": jd}
+
+
+def _skills(inp: Dict[str, Any]) -> Dict[str, Any]:
+    text = inp["parsed"].get("text", "") or ""
+    jd = inp["job_description"]
+    jd_skills = jd["skills"] if jd else []
+    wanted = list(dict.fromkeys(list(jd_skills) + list(inp.get("skill_list") or [])))
+    # whole-token matches only ("java" must not match "JavaScript")
+    detected = find_literal_skills(text, wanted)
+    resume_skills = sorted(set(extract_skills_from_text(text)) | {s.lower() for s in detected})
+    if inp["profile"] == FAST:
+        gap = literal_skill_gap(text, jd_skills)
+    else:
+        gap = _compute_skill_gap(text, jd_skills)
+    return {"detected_skills": detected, "resume_skills": resume_skills, "skill_gap": gap}
+
+
+def _compute_skill_gap(text: str, jd_skills: list) -> Dict[str, Any]:
+    try:
+        return semantic_skill_gap(text, jd_skills)
+    except Exception:
+        return literal_skill_gap(text, jd_skills)
+
+
+def _quality(inp: Dict[str, Any]) -> Dict[str, Any]:
+    return {"quality": scoring_model.analyze_text_quality(inp["parsed"].get("text", ""))}
+
+
+def _semantic(inp: Dict[str, Any]) -> Dict[str, Any]:
+    jd = inp["job_description"]
+    sem = scoring_model.compute_semantic_similarities(
+        inp["parsed"],
+        jd["text"] if jd else "",
+        jd_embedding=jd.get("embedding") if jd else None,
+    )
+    return {"semantic": sem}
+
+
+def _scoring(inp: Dict[str, Any]) -> Dict[str, Any]:
+    text = inp["parsed"].get("text", "") or ""
+    jd = inp["job_description"]
+    jd_skills = jd["skills"] if jd else []
+    gap = inp["skill_gap"]
+    missing_skills = [m["skill"] for m in gap["missing"]]
+    quality = inp.get("quality")
+    semantic = inp.get("semantic")
+    suggestions = []
+
+    # breakdown only carries the components that make up final_score in this profile
+    if semantic is not None:
+        semantic_score = semantic.get("overall_similarity", 0.0)
+        grammar_issues = (quality or {}).get("total_issues_count", 0)
+
+        # Convert semantic similarity (0-1) to 0-100 scale
+        semantic_score_100 = int(semantic_score * 100)
+
+        # Grammar score: reduce by 2 points per issue, min 0
+        grammar_penalty = min(grammar_issues * 2, 50)
+        grammar_score = max(0, 100 - grammar_penalty)
+
+        # Final score weighted average: 70% semantic, 30% grammar
+        final_score = int((semantic_score_100 * 0.7) + (grammar_score * 0.3))
+        breakdown = {"semantic_score": semantic_score_100, "grammar_score": grammar_score}
+
+        if grammar_issues > 5:
+            suggestions.append(f"Fix {grammar_issues} grammar and spelling issues to improve professionalism")
+        if semantic_score < 0.3:
+            suggestions.append("Add more relevant keywords from the job description")
+        if semantic_score < 0.5:
+            suggestions.append("Expand on relevant experience and skills that match the job requirements")
+    else:
+        # no embeddings in this profile: keyword / heuristic score from core.scoring
+        keyword = calculate_scores(inp["resume_skills"], jd_skills, text)
+        final_score = keyword["match_score"]
+        # semantic_score there is an unused placeholder
+        breakdown = {k: v for k, v in keyword["breakdown"].items() if k != "semantic_score"}
+        if jd_skills and breakdown["skill_score"] < 50:
+            suggestions.append("Add more relevant keywords from the job description")
+
+    breakdown["match_score"] = final_score
+    if len(text) < 500:
+        suggestions.append("Consider adding more detail to your resume")
+    if missing_skills:
+        suggestions.append(f"Show experience with: {', '.join(missing_skills[:5])}")
+
+    return {"score": {"final_score": final_score, "breakdown": breakdown, "suggestions": suggestions}}
+
+
+PIPELINE = Pipeline(
+    [
+        Stage("extract", _extract, inputs=["resume_path"], optional_inputs=["parse_timeout"], outputs=["parsed"]),
+        Stage("jd", _job_description, inputs=["profile"], optional_inputs=["jd", "jd_text"], outputs=["job_description"]),
+        Stage(
+            "skills",
+            _skills,
+            inputs=["parsed", "job_description", "profile"],
+            optional_inputs=["skill_list"],
+            outputs=["detected_skills", "resume_skills", "skill_gap"],
+        ),
+        Stage("quality", _quality, inputs=["parsed"], outputs=["quality"], profiles=[FULL]),
+        Stage("semantic", _semantic, inputs=["parsed", "job_description"], outputs=["semantic"], profiles=[FULL]),
+        Stage(
+            "scoring",
+            _scoring,
+            inputs=["parsed", "job_description", "resume_skills", "skill_gap"],
+            optional_inputs=["quality", "semantic"],
+            outputs=["score"],
+        ),
+    ],
+    profiles=PROFILES,
+)
+
+# what skipped stages report (same shape as when the optional dependency is missing)
+_EMPTY_QUALITY = {"total_issues_count": 0, "spelling_issues_count": 0, "grammar_issues_count": 0, "issues_preview": []}
+_EMPTY_SEMANTIC = {"overall_similarity": 0.0, "per_section_similarity": {}}
+
+
+# -------------------------
+# Entry point
+# -------------------------
+def run_analysis(
+    resume_path: str,
+    jd_text: str = "",
+    jd: Optional[Dict[str, Any]] = None,
+    skill_list: Optional[List[str]] = None,
+    profile: str = FULL,
+    parse_timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Analyze a resume file, optionally against a job description.
+
+    Args:
+        resume_path: path to resume file (pdf / docx / text)
+        jd_text: job description text (ignored if jd is given)
+        jd: preprocessed JD record (jd_registry.get_job_description / preprocess_job_description)
+        skill_list: extra skills to detect in the resume
+        profile: "fast" or "full" (see module docstring)
+        parse_timeout: wall-clock budget for parsing, in a killable child process
+
+    Returns:
+        JSON-serializable analysis result (parsed_resume, quality, semantic, skill_gap,
+        features_enhanced, final_score, breakdown, suggestions, ...)
+    """
+    ctx = PIPELINE.run(
+        {
+            "resume_path": resume_path,
+            "jd": jd,
+            "jd_text": jd_text or "",
+            "skill_list": skill_list or [],
+            "parse_timeout": parse_timeout,
+            "profile": profile,
+        },
+        profile,
+    )
+
+    parsed = ctx["parsed"]
+    parsed["detected_skills"] = ctx["detected_skills"]
+    parsed["skills"] = ctx["detected_skills"]
+    quality = ctx.get("quality", dict(_EMPTY_QUALITY))
+    sem = ctx.get("semantic", dict(_EMPTY_SEMANTIC))
+    gap = ctx["skill_gap"]
+    jd = ctx["job_description"]
+    score = ctx["score"]
+
+    features = parsed.get("features", {}) or {}
+    features_enhanced = {
+        **features,
+        "total_grammar_issues": quality.get("total_issues_count"),
+        "spelling_issues_count": quality.get("spelling_issues_count"),
+        "grammar_issues_count": quality.get("grammar_issues_count"),
+        "semantic_overall_similarity": sem.get("overall_similarity"),
+        "semantic_per_section_similarity": sem.get("per_section_similarity"),
+        "matched_skills_count": len(gap["matched"]),
+        "missing_skills_count": len(gap["missing"]),
+    }
+
+    return {
+        "profile": profile,
+        "parsed_resume": parsed,
+        "quality": quality,
+        "semantic": sem,
+        "skill_gap": gap,
+        "features_enhanced": features_enhanced,
+        "final_score": score["final_score"],
+        "breakdown": score["breakdown"],
+        "suggestions": score["suggestions"],
+        "extracted_skills": ctx["resume_skills"],
+        "jd_id": jd["id"] if jd else None,
+        "job_description_skills": jd["skills"] if jd else [],
+        "matched_skills": [m["skill"] for m in gap["matched"]],
+        "missing_skills": [m["skill"] for m in gap["missing"]],
+        "timings_ms": ctx["timings"],
+    }
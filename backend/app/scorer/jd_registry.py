@@ -0,0 +1,384 @@
+"""
+jd_registry.py
+Register a job description once and score resumes against it by id.
+
+A registered JD is preprocessed a single time and persisted to a local SQLite
+file so that /analyze_with_jd only has to do resume-side work:
+- normalized text (same cleanup as resume text)
+- skill set (core.scoring.parse_job_description)
+- section texts + embeddings (Requirements, Responsibilities, ...)
+- chunk texts + embeddings (paragraphs / bullet points)
+- whole-JD embedding (used for overall / per-section similarity)
+
+Identical JD texts are deduplicated by content hash, so registering the same
+JD twice returns the same id.
+
+Storage location: env var JD_REGISTRY_PATH, default backend/app/data/jd_registry.db
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+from . import scoring_model
+from ..core.scoring import parse_job_description
+from ..parser.resume_parser import _normalize_text
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parents[1] / "data" / "jd_registry.db"
+
+# cap on stored chunks per JD (very long JDs are mostly boilerplate)
+MAX_CHUNKS = 64
+MIN_CHUNK_CHARS = 20
+
+# common JD headings -> canonical section name
+_SECTION_HEADINGS = {
+    "summary": r"about (the )?(role|job|position)|overview|summary|job description",
+    "responsibilities": r"responsibilities|what you('| wi)ll do|duties|the role|key responsibilities",
+    "requirements": r"requirements|qualifications|what you('| wi)ll (need|bring)|must have|required skills|skills",
+    "preferred": r"preferred( qualifications)?|nice to have|bonus( points)?|good to have",
+    "benefits": r"benefits|perks|what we offer",
+}
+_HEADING_RE = [
+    (name, re.compile(r"^\s*(" + pattern + r")\s*:?\s*$", re.I))
+    for name, pattern in _SECTION_HEADINGS.items()
+]
+
+
+# -------------------------
+# Text preprocessing
+# -------------------------
+def _match_heading(line: str) -> Optional[str]:
+    if len(line) > 60:
+        return None
+    for name, rx in _HEADING_RE:
+        if rx.match(line):
+            return name
+    return None
+
+
+def split_jd_sections(text: str) -> Dict[str, str]:
+    """
+    Split JD text into canonical sections based on heading lines.
+    Returns {} when no known heading is found.
+    """
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for line in (text or "").split("\n"):
+        heading = _match_heading(line)
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+        elif current and line.strip():
+            sections[current].append(line.strip())
+    return {name: "\n".join(lines) for name, lines in sections.items() if lines}
+
+
+_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+
+def split_jd_chunks(text: str) -> List[str]:
+    """
+    Split JD text into paragraph / bullet chunks suitable for embedding.
+    Heading lines are dropped; each bullet point starts a new chunk.
+    """
+    chunks = []
+    current: List[str] = []
+
+    def flush():
+        chunk = " ".join(" ".join(current).split())
+        if len(chunk) >= MIN_CHUNK_CHARS:
+            chunks.append(chunk)
+        current.clear()
+
+    for line in (text or "").split("\n"):
+        if not line.strip() or _match_heading(line):
+            flush()
+            continue
+        if _BULLET_RE.match(line):
+            flush()
+            line = _BULLET_RE.sub("", line)
+        current.append(line)
+    flush()
+    return chunks[:MAX_CHUNKS]
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _encode(texts: List[str]):
+    """
+    Batch-encode texts with the shared embedding model.
+    Returns a float32 (n, dim) array, or None if embeddings are unavailable.
+    """
+    if not texts or np is None or scoring_model.SentenceTransformer is None:
+        return None
+    model = scoring_model.get_embed_model()
+    emb = model.encode(texts, convert_to_numpy=True)
+    return np.asarray(emb, dtype=np.float32)
+
+
+def preprocess_job_description(jd_text: str, embed: bool = True, embed_parts: bool = True) -> Dict[str, Any]:
+    """
+    Compute everything the analysis pipeline needs from a JD.
+    The returned record can be passed directly to build_enhanced_features(jd=...).
+    embed=False skips the embedding model (text, sections, chunks and skills only).
+    embed_parts=False embeds only the whole JD, not its sections and chunks
+    (one-off JDs: analysis only reads record["embedding"]).
+    """
+    text = _normalize_text(jd_text or "")
+    sections = split_jd_sections(text)
+    chunks = split_jd_chunks(text)
+
+    section_names = list(sections.keys()) if embed_parts else []
+    part_chunks = chunks if embed_parts else []
+    # one batch: [whole JD] + sections + chunks
+    emb = _encode([text] + [sections[n] for n in section_names] + part_chunks) if text and embed else None
+
+    record = {
+        "id": None,
+        "content_hash": _content_hash(text),
+        "text": text,
+        "skills": parse_job_description(text),
+        "sections": sections,
+        "chunks": chunks,
+        "embedding": None,
+        "section_embeddings": {},
+        "chunk_embeddings": None,
+        "model_name": scoring_model.EMBED_MODEL_NAME if emb is not None else None,
+    }
+    if emb is not None:
+        n_sec = len(section_names)
+        record["embedding"] = emb[0]
+        record["section_embeddings"] = {name: emb[1 + i] for i, name in enumerate(section_names)}
+        record["chunk_embeddings"] = emb[1 + n_sec:] if part_chunks else None
+    return record
+
+
+# -------------------------
+# SQLite storage
+# -------------------------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_descriptions (
+    id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    skills TEXT NOT NULL,
+    sections TEXT NOT NULL,
+    chunks TEXT NOT NULL,
+    model_name TEXT,
+    embed_dim INTEGER,
+    embedding BLOB,
+    section_embeddings BLOB,
+    chunk_embeddings BLOB,
+    created_at TEXT NOT NULL
+)
+"""
+
+
+def _db_path() -> str:
+    return os.getenv("JD_REGISTRY_PATH") or str(DEFAULT_DB_PATH)
+
+
+def _connect() -> sqlite3.Connection:
+    path = _db_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def _to_blob(arr) -> Optional[bytes]:
+    if arr is None:
+        return None
+    return np.asarray(arr, dtype=np.float32).tobytes()
+
+
+def _from_blob(blob: Optional[bytes], dim: Optional[int]):
+    if blob is None or not dim or np is None:
+        return None
+    return np.frombuffer(blob, dtype=np.float32).reshape(-1, dim)
+
+
+def _row_to_record(row: sqlite3.Row) -> Dict[str, Any]:
+    sections = json.loads(row["sections"])
+    dim = row["embed_dim"]
+    emb = _from_blob(row["embedding"], dim)
+    sec_emb = _from_blob(row["section_embeddings"], dim)
+    return {
+        "id": row["id"],
+        "content_hash": row["content_hash"],
+        "text": row["text"],
+        "skills": json.loads(row["skills"]),
+        "sections": sections,
+        "chunks": json.loads(row["chunks"]),
+        "embedding": emb[0] if emb is not None else None,
+        "section_embeddings": (
+            {name: sec_emb[i] for i, name in enumerate(sections)} if sec_emb is not None else {}
+        ),
+        "chunk_embeddings": _from_blob(row["chunk_embeddings"], dim),
+        "model_name": row["model_name"],
+        "created_at": row["created_at"],
+    }
+
+
+def _embedding_values(record: Dict[str, Any]):
+    emb = record["embedding"]
+    sec_emb = [record["section_embeddings"][n] for n in record["sections"]] if record["section_embeddings"] else None
+    return (
+        record["model_name"],
+        int(emb.shape[-1]) if emb is not None else None,
+        _to_blob(emb),
+        _to_blob(sec_emb) if sec_emb else None,
+        _to_blob(record["chunk_embeddings"]),
+    )
+
+
+def _insert(conn: sqlite3.Connection, record: Dict[str, Any]) -> None:
+    # first writer wins: a concurrent registration of the same JD must not
+    # replace (and so invalidate the id of) a row that was already returned
+    conn.execute(
+        "INSERT INTO job_descriptions "
+        "(id, content_hash, text, skills, sections, chunks, model_name, embed_dim, "
+        " embedding, section_embeddings, chunk_embeddings, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(content_hash) DO NOTHING",
+        (
+            record["id"],
+            record["content_hash"],
+            record["text"],
+            json.dumps(record["skills"]),
+            json.dumps(record["sections"]),
+            json.dumps(record["chunks"]),
+            *_embedding_values(record),
+            record["created_at"],
+        ),
+    )
+    conn.commit()
+
+
+def _update_embeddings(conn: sqlite3.Connection, record: Dict[str, Any]) -> None:
+    # refresh in place; id, hash and created_at never change
+    conn.execute(
+        "UPDATE job_descriptions SET skills = ?, sections = ?, chunks = ?, model_name = ?, embed_dim = ?, "
+        "embedding = ?, section_embeddings = ?, chunk_embeddings = ? WHERE id = ?",
+        (
+            json.dumps(record["skills"]),
+            json.dumps(record["sections"]),
+            json.dumps(record["chunks"]),
+            *_embedding_values(record),
+            record["id"],
+        ),
+    )
+    conn.commit()
+
+
+def _is_stale(record: Dict[str, Any]) -> bool:
+    # embeddings missing (registered without sentence-transformers) or made by another model
+    if scoring_model.SentenceTransformer is None or np is None or not record["text"]:
+        return False
+    return record["embedding"] is None or record["model_name"] != scoring_model.EMBED_MODEL_NAME
+
+
+def _refresh(conn: sqlite3.Connection, record: Dict[str, Any]) -> Dict[str, Any]:
+    fresh = preprocess_job_description(record["text"])
+    fresh["id"] = record["id"]
+    fresh["created_at"] = record["created_at"]
+    _update_embeddings(conn, fresh)
+    return fresh
+
+
+def register_job_description(jd_text: str) -> Dict[str, Any]:
+    """
+    Preprocess and persist a JD. Returns the stored record (with its id).
+    Re-registering an identical JD returns the existing record.
+    """
+    text = _normalize_text(jd_text or "")
+    content_hash = _content_hash(text)
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM job_descriptions WHERE content_hash = ?", (content_hash,)).fetchone()
+        if row is None:
+            record = preprocess_job_description(text)
+            record["id"] = uuid.uuid4().hex
+            record["created_at"] = datetime.now(timezone.utc).isoformat()
+            _insert(conn, record)
+            # re-select: a concurrent registration may have inserted first
+            row = conn.execute("SELECT * FROM job_descriptions WHERE content_hash = ?", (content_hash,)).fetchone()
+        record = _row_to_record(row)
+        if _is_stale(record):
+            record = _refresh(conn, record)
+    finally:
+        conn.close()
+    _load_job_description.cache_clear()
+    return _read_only(record)
+
+
+@lru_cache(maxsize=128)
+def _load_job_description(jd_id: str, embed: bool) -> Optional[Dict[str, Any]]:
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM job_descriptions WHERE id = ?", (jd_id,)).fetchone()
+        if row is None:
+            return None
+        record = _row_to_record(row)
+        if embed and _is_stale(record):
+            record = _refresh(conn, record)
+        return _read_only(record)
+    finally:
+        conn.close()
+
+
+def _read_only(record: Dict[str, Any]) -> Dict[str, Any]:
+    # embeddings are shared between requests through the cache; make accidental writes fail
+    for arr in [record["embedding"], record["chunk_embeddings"], *record["section_embeddings"].values()]:
+        if arr is not None:
+            arr.setflags(write=False)
+    return record
+
+
+def get_job_description(jd_id: str, embed: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Load a registered JD by id (cached in memory). Returns None if unknown.
+    Records with missing/outdated embeddings are refreshed on load, unless
+    embed=False (callers that don't use embeddings, e.g. the fast profile,
+    must not load the embedding model; the stored embeddings are returned as-is).
+    The returned dict is a per-call copy; its embedding arrays are shared and read-only.
+    """
+    record = _load_job_description(jd_id, embed)
+    if record is None:
+        return None
+    return {
+        **record,
+        "skills": list(record["skills"]),
+        "sections": dict(record["sections"]),
+        "chunks": list(record["chunks"]),
+        "section_embeddings": dict(record["section_embeddings"]),
+    }
+
+
+def describe_job_description(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    JSON-safe summary of a JD record (no embeddings).
+    """
+    return {
+        "jd_id": record["id"],
+        "skills": record["skills"],
+        "sections": list(record["sections"].keys()),
+        "chunks_count": len(record["chunks"]),
+        "has_embeddings": record["embedding"] is not None,
+        "created_at": record.get("created_at"),
+    }
@@ -111,11 +111,13 @@ except Exception:
 # -------------------------
 # Embedding model (cached)
 # -------------------------
+EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+
 @lru_cache(maxsize=1)
 def get_embed_model():
     if SentenceTransformer is None:
         raise RuntimeError("sentence-transformers not installed. pip install sentence-transformers")
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+    model = SentenceTransformer(EMBED_MODEL_NAME)
     return model
 
 # -------------------------
@@ -198,14 +200,23 @@ def cosine_similarity_between_embeddings(a, b):
             sim = float((a_np @ b_np) / denom)
     return (sim + 1.0) / 2.0
 
-def compute_semantic_similarities(parsed_resume: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
+def compute_semantic_similarities(parsed_resume: Dict[str, Any], jd_text: str, jd_embedding=None) -> Dict[str, Any]:
+    """
+    jd_embedding: optional precomputed JD embedding (e.g. from the JD registry).
+    When given, the JD is not re-encoded and only the resume side is embedded.
+    """
     if SentenceTransformer is None:
         return {"overall_similarity": 0.0, "per_section_similarity": {}}
 
     model = get_embed_model()
     resume_text = parsed_resume.get("text", "") or ""
     jd_text = jd_text or ""
-    emb_jd = embed_text_chunks(jd_text, model) if jd_text.strip() else None
+    if jd_embedding is not None:
+        # stored embeddings are numpy; util.cos_sim needs a tensor on the model's device
+        import torch
+        emb_jd = torch.as_tensor(jd_embedding, device=model.device)
+    else:
+        emb_jd = embed_text_chunks(jd_text, model) if jd_text.strip() else None
     emb_resume = embed_text_chunks(resume_text, model) if resume_text.strip() else None
     overall_sim = cosine_similarity_between_embeddings(emb_resume, emb_jd)
 
@@ -224,39 +235,16 @@ def compute_semantic_similarities(parsed_resume: Dict[str, Any], jd_text: str) -
 # -------------------------
 # Combined pipeline entry
 # -------------------------
-def build_enhanced_features(resume_path: str, jd_text: str = "", skill_list: list = None) -> Dict[str, Any]:
+def build_enhanced_features(resume_path: str, jd_text: str = "", skill_list: list = None, jd: Dict[str, Any] = None, parse_timeout: float = None) -> Dict[str, Any]:
     """
     Top-level function that parses resume and computes features.
-    """
-    # Ensure parser is available
-    global parse_resume_file, _parser_import_error
-    if parse_resume_file is None:
-        # raise clear error (so logs will show)
-        raise ImportError(f"parse_resume_file not found. Details: {_parser_import_error}")
-
-    parsed = parse_resume_file(resume_path, skill_list=skill_list or [])
-    text = parsed.get("text", "")
 
-    quality = analyze_text_quality(text)
-    sem = compute_semantic_similarities(parsed, jd_text or "")
-
-    features = parsed.get("features", {}) or {}
-    features_enhanced = {
-        **features,
-        "total_grammar_issues": quality.get("total_issues_count"),
-        "spelling_issues_count": quality.get("spelling_issues_count"),
-        "grammar_issues_count": quality.get("grammar_issues_count"),
-        "semantic_overall_similarity": sem.get("overall_similarity"),
-        "semantic_per_section_similarity": sem.get("per_section_similarity"),
-    }
-
-    result = {
-        "parsed_resume": parsed,
-        "quality": quality,
-        "semantic": sem,
-        "features_enhanced": features_enhanced
-    }
-    return result
+    Thin wrapper around the "full" profile of the analysis pipeline
+    (app/pipeline/stages.py::run_analysis), kept for existing callers.
+    """
+    # imported lazily: the pipeline stages import this module
+    from ..pipeline.stages import run_analysis
+    return run_analysis(resume_path, jd_text=jd_text, jd=jd, skill_list=skill_list, profile="full", parse_timeout=parse_timeout)
 
 # -------------------------
 # Self-test (when run directly)
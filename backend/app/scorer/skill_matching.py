@@ -0,0 +1,267 @@
+"""
+skill_matching.py
+Embedding-based skill gap analysis.
+
+A literal set difference reports "PyTorch" as missing when the resume says
+"deep learning with Torch". This module matches JD skills against the resume
+semantically:
+- the skill taxonomy (data/skills.json) is embedded once and persisted to
+  disk (data/skill_embeddings.npz), keyed by model name + taxonomy contents
+- resume text is split into short chunks that are embedded in one batch
+- a single (skills x chunks) matmul of normalized embeddings gives the best
+  matching chunk and a confidence score for every JD skill
+
+Skills that literally occur in the resume as whole tokens always match with
+confidence 1.0.
+Without sentence-transformers/numpy the gap falls back to literal matching only.
+
+Storage location: env var SKILL_EMBEDDINGS_PATH, default backend/app/data/skill_embeddings.npz
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+from . import scoring_model
+from ..core.scoring import BASE_SKILLS
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+TAXONOMY_PATH = DATA_DIR / "skills.json"
+DEFAULT_EMBEDDINGS_PATH = DATA_DIR / "skill_embeddings.npz"
+
+# cosine similarity above which a skill counts as present in the resume
+SEMANTIC_MATCH_THRESHOLD = 0.5
+
+# resume chunking
+MAX_CHUNK_CHARS = 200
+MAX_CHUNKS = 128
+
+
+# -------------------------
+# Taxonomy
+# -------------------------
+@lru_cache(maxsize=1)
+def load_skill_taxonomy() -> Tuple[Tuple[str, str], ...]:
+    """
+    Returns ((skill, text_to_embed), ...) from data/skills.json.
+    Falls back to core.scoring.BASE_SKILLS if the file is missing or empty.
+    """
+    entries = []
+    try:
+        with open(TAXONOMY_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for item in data:
+            if isinstance(item, str):
+                entries.append((item.lower(), item))
+            elif isinstance(item, dict) and item.get("skill"):
+                entries.append((item["skill"].lower(), item.get("description") or item["skill"]))
+    except Exception:
+        entries = []
+    if not entries:
+        entries = [(s, s) for s in sorted(BASE_SKILLS)]
+    return tuple(entries)
+
+
+def _embeddings_path() -> str:
+    return os.getenv("SKILL_EMBEDDINGS_PATH") or str(DEFAULT_EMBEDDINGS_PATH)
+
+
+def _fingerprint(entries) -> str:
+    payload = json.dumps([scoring_model.EMBED_MODEL_NAME, list(entries)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _encode_normalized(texts: List[str]):
+    model = scoring_model.get_embed_model()
+    emb = model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    return np.asarray(emb, dtype=np.float32)
+
+
+def _write_atomic(path: str, **arrays) -> None:
+    """
+    np.savez to a temp file in the same directory, then os.replace it into place,
+    so concurrent workers never load a half-written file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        # write via a file object so np.savez does not append another ".npz"
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+@lru_cache(maxsize=1)
+def get_skill_embeddings():
+    """
+    (skill -> row index, normalized (n_skills, dim) matrix) for the taxonomy.
+    Loaded from disk when the persisted file matches the current model and
+    taxonomy; otherwise computed once and written back.
+    Returns None when embeddings are unavailable.
+    """
+    if np is None or scoring_model.SentenceTransformer is None:
+        return None
+
+    entries = load_skill_taxonomy()
+    fp = _fingerprint(entries)
+    path = _embeddings_path()
+
+    matrix = None
+    try:
+        with np.load(path, allow_pickle=False) as stored:
+            if str(stored["fingerprint"]) == fp:
+                matrix = stored["matrix"]
+    except Exception:
+        matrix = None
+
+    if matrix is None:
+        matrix = _encode_normalized([text for _, text in entries])
+        try:
+            _write_atomic(path, fingerprint=np.array(fp), matrix=matrix)
+        except Exception:
+            # read-only filesystem etc. - keep the in-memory copy
+            pass
+
+    index = {skill: i for i, (skill, _) in enumerate(entries)}
+    return index, matrix
+
+
+# -------------------------
+# Resume chunking
+# -------------------------
+def split_resume_chunks(text: str) -> List[str]:
+    """
+    Group resume lines into chunks of up to MAX_CHUNK_CHARS characters.
+    Blank lines always end a chunk.
+    """
+    chunks = []
+    current = ""
+    for line in (text or "").split("\n"):
+        line = " ".join(line.split())
+        if not line:
+            if current:
+                chunks.append(current)
+            current = ""
+            continue
+        if current and len(current) + 1 + len(line) > MAX_CHUNK_CHARS:
+            chunks.append(current)
+            current = line
+        else:
+            current = f"{current} {line}" if current else line
+    if current:
+        chunks.append(current)
+    return chunks[:MAX_CHUNKS]
+
+
+def _literal_match(skill: str, lowered: str) -> bool:
+    phrase = skill.lower().strip()
+    if not phrase:
+        return False
+    # word boundaries don't work around symbols like "c++" / "ci/cd"
+    return re.search(r"(?<![a-z0-9])" + re.escape(phrase) + r"(?![a-z0-9+#])", lowered) is not None
+
+
+def find_literal_skills(text: str, skills: List[str]) -> List[str]:
+    """
+    Skills that literally occur in text as whole tokens ("java" does not match
+    "JavaScript", "c" does not match "C++"). Order follows `skills`.
+    """
+    lowered = (text or "").lower()
+    return [s for s in dict.fromkeys(skills or []) if s and _literal_match(s, lowered)]
+
+
+# -------------------------
+# Gap analysis
+# -------------------------
+def literal_skill_gap(resume_text: str, jd_skills: List[str]) -> Dict[str, Any]:
+    """
+    Same shape as semantic_skill_gap, using whole-token literal matches only
+    (no embedding model; used by the "fast" pipeline profile and as fallback).
+    """
+    skills = list(dict.fromkeys(s for s in (jd_skills or []) if s))
+    found = set(find_literal_skills(resume_text, skills))
+    out = {"matched": [], "missing": [], "method": "literal"}
+    for s in skills:
+        hit = s in found
+        out["matched" if hit else "missing"].append({"skill": s, "confidence": 1.0 if hit else 0.0, "evidence": None})
+    return out
+
+
+def semantic_skill_gap(
+    resume_text: str,
+    jd_skills: List[str],
+    threshold: float = SEMANTIC_MATCH_THRESHOLD,
+) -> Dict[str, Any]:
+    """
+    Match JD skills against the resume.
+
+    Args:
+        resume_text: resume plain text
+        jd_skills: skills required by the JD
+        threshold: minimum cosine similarity for a semantic match
+
+    Returns:
+        {
+            "matched": [{"skill", "confidence", "evidence"}, ...],
+            "missing": [{"skill", "confidence", "evidence"}, ...],
+            "method": "semantic" | "literal"
+        }
+    """
+    out = {"matched": [], "missing": [], "method": "literal"}
+    skills = list(dict.fromkeys(s for s in (jd_skills or []) if s))
+    if not skills:
+        return out
+
+    # only boundary-safe literal hits get full confidence; substring-based
+    # detections (e.g. "java" inside "JavaScript") are not trusted here
+    confidence = {s: 1.0 for s in find_literal_skills(resume_text, skills)}
+    evidence = {s: None for s in confidence}
+
+    pending = [s for s in skills if s not in confidence]
+    chunks = split_resume_chunks(resume_text)
+    store = get_skill_embeddings() if pending and chunks else None
+
+    if store is not None:
+        index, matrix = store
+        known = [s for s in pending if s.lower() in index]
+        unknown = [s for s in pending if s.lower() not in index]
+
+        # one batch for the request: resume chunks + any skills outside the taxonomy
+        emb = _encode_normalized(chunks + unknown)
+        chunk_emb = emb[: len(chunks)]
+        skill_emb = matrix[[index[s.lower()] for s in known]]
+        if unknown:
+            skill_emb = np.vstack([skill_emb, emb[len(chunks):]]) if known else emb[len(chunks):]
+
+        sims = skill_emb @ chunk_emb.T  # (skills, chunks)
+        best = sims.argmax(axis=1)
+        for row, s in enumerate(known + unknown):
+            confidence[s] = max(0.0, float(sims[row, best[row]]))
+            evidence[s] = chunks[best[row]]
+        out["method"] = "semantic"
+    else:
+        for s in pending:
+            confidence[s] = 0.0
+            evidence[s] = None
+
+    for s in skills:
+        item = {"skill": s, "confidence": round(confidence[s], 4), "evidence": evidence[s]}
+        if confidence[s] >= threshold:
+            out["matched"].append(item)
+        else:
+            out["missing"].append(item)
+    return out
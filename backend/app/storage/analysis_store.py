@@ -0,0 +1,362 @@
+"""
+analysis_store.py
+Compact, append-only SQLite store for analysis history.
+
+Replaces "one pretty-printed JSON file per analysis" for analytics:
+- resume text is stored once per content hash (zlib-compressed), not per analysis
+- scores / dates live in plain columns with indexes
+- skills live in a separate (skill, kind) table with an index, so
+  "top 50 candidates with skill X and score > 70" is an index lookup
+  instead of loading every JSON file
+- each analysis records its pipeline profile: "fast" (keyword heuristic) and
+  "full" (semantic + grammar) scores are on different scales, so filter by
+  profile before ranking by score
+
+Storage location: env var ANALYSIS_STORE_PATH, default backend/app/data/analyses.db
+
+Import existing JSON analyses:
+    python -m backend.app.storage.analysis_store analyses/ backend/analyses/
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import uuid
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterable
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parents[1] / "data" / "analyses.db"
+
+# skill kinds stored in analysis_skills
+EXTRACTED = "extracted"  # found in the resume text
+MATCHED = "matched"  # JD skills matched by embedding similarity only (no literal hit)
+MISSING = "missing"
+JD = "jd"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resume_texts (
+    content_hash TEXT PRIMARY KEY,
+    text_z BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    filename TEXT,
+    resume_hash TEXT REFERENCES resume_texts(content_hash),
+    jd_id TEXT,
+    profile TEXT,
+    score INTEGER NOT NULL DEFAULT 0,
+    breakdown TEXT NOT NULL DEFAULT '{}',
+    suggestions TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analysis_skills (
+    analysis_id TEXT NOT NULL REFERENCES analyses(id),
+    skill TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    PRIMARY KEY (analysis_id, kind, skill)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_analyses_score ON analyses(score DESC, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_analyses_created_at ON analyses(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_analyses_resume_hash ON analyses(resume_hash);
+CREATE INDEX IF NOT EXISTS idx_analysis_skills_skill ON analysis_skills(kind, skill, analysis_id);
+"""
+
+# created after the migration below, so it also works on stores that predate the column
+_PROFILE_INDEX = "CREATE INDEX IF NOT EXISTS idx_analyses_profile_score ON analyses(profile, score DESC, created_at DESC)"
+
+
+def _db_path() -> str:
+    return os.getenv("ANALYSIS_STORE_PATH") or str(DEFAULT_DB_PATH)
+
+
+def _connect() -> sqlite3.Connection:
+    path = _db_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(analyses)")}
+    if "profile" not in columns:
+        # stores created before analyses recorded their profile
+        conn.execute("ALTER TABLE analyses ADD COLUMN profile TEXT")
+    conn.execute(_PROFILE_INDEX)
+    return conn
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _skills(values: Optional[Iterable[str]]) -> List[str]:
+    return sorted({str(v).strip().lower() for v in values or [] if v and str(v).strip()})
+
+
+# -------------------------
+# Writes
+# -------------------------
+def _insert(conn: sqlite3.Connection, record: Dict[str, Any]) -> bool:
+    """
+    Insert one normalized record. Returns False if the id already exists
+    (the store is append-only; existing analyses are never rewritten).
+    """
+    text = record.get("resume_text") or ""
+    resume_hash = None
+    if text:
+        resume_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        conn.execute(
+            "INSERT OR IGNORE INTO resume_texts (content_hash, text_z) VALUES (?, ?)",
+            (resume_hash, zlib.compress(text.encode("utf-8"))),
+        )
+
+    cur = conn.execute(
+        "INSERT OR IGNORE INTO analyses "
+        "(id, filename, resume_hash, jd_id, profile, score, breakdown, suggestions, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            record["id"],
+            record.get("filename"),
+            resume_hash,
+            record.get("jd_id"),
+            record.get("profile"),
+            int(record.get("score") or 0),
+            json.dumps(record.get("breakdown") or {}),
+            json.dumps(record.get("suggestions") or []),
+            record.get("created_at") or _now(),
+        ),
+    )
+    if cur.rowcount == 0:
+        return False
+
+    rows = [
+        (record["id"], skill, kind)
+        for kind in (EXTRACTED, MATCHED, MISSING, JD)
+        for skill in _skills(record.get(kind + "_skills"))
+    ]
+    conn.executemany(
+        "INSERT OR IGNORE INTO analysis_skills (analysis_id, skill, kind) VALUES (?, ?, ?)", rows
+    )
+    return True
+
+
+def _normalize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map either an /analyze_with_jd response or a legacy analyses/*.json file
+    onto the store's columns.
+    """
+    parsed = result.get("parsed_resume") or {}
+    breakdown = result.get("breakdown") or {}
+    gap = result.get("skill_gap") or {}
+    # literal hits (confidence 1.0) already show up as extracted skills;
+    # MATCHED is only what the embedding model added
+    semantic = [
+        m["skill"] for m in gap.get("matched") or []
+        if gap.get("method") == "semantic" and m.get("confidence", 1.0) < 1.0
+    ]
+    score = result.get("final_score")
+    if score is None:
+        score = result.get("match_score", breakdown.get("match_score", 0))
+    profile = result.get("profile")
+    if profile is None:
+        # legacy JSON files were scored by core.scoring.calculate_scores, the fast profile's scale
+        profile = "fast" if "skill_score" in breakdown else "full"
+    return {
+        "id": result.get("analysis_id") or result.get("id") or uuid.uuid4().hex,
+        "filename": result.get("filename"),
+        "resume_text": parsed.get("text") or result.get("text_snippet") or "",
+        "jd_id": result.get("jd_id"),
+        "profile": profile,
+        "score": score,
+        "breakdown": breakdown,
+        "suggestions": result.get("suggestions") or [],
+        "created_at": result.get("created_at"),
+        "extracted_skills": list(result.get("extracted_skills") or []) + list(parsed.get("skills") or []),
+        "matched_skills": semantic,
+        "missing_skills": result.get("missing_skills") or [],
+        "jd_skills": result.get("job_description_skills") or [],
+    }
+
+
+def save_analysis(result: Dict[str, Any], filename: Optional[str] = None) -> str:
+    """
+    Append one analysis result to the store and return its id.
+    """
+    record = _normalize_result(result)
+    if filename:
+        record["filename"] = filename
+    conn = _connect()
+    try:
+        _insert(conn, record)
+        conn.commit()
+    finally:
+        conn.close()
+    return record["id"]
+
+
+def import_json_dir(*dirs: str) -> int:
+    """
+    Import legacy one-file-per-analysis JSON directories (e.g. analyses/).
+    Files without a date use the file modification time. Already imported
+    ids are skipped, so this is safe to re-run. Returns number of new rows.
+    """
+    added = 0
+    conn = _connect()
+    try:
+        for d in dirs:
+            for path in sorted(Path(d).glob("*.json")):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except Exception:
+                    continue
+                data.setdefault("id", path.stem)
+                if not data.get("created_at"):
+                    data["created_at"] = datetime.fromtimestamp(
+                        path.stat().st_mtime, timezone.utc
+                    ).isoformat()
+                if _insert(conn, _normalize_result(data)):
+                    added += 1
+        conn.commit()
+    finally:
+        conn.close()
+    return added
+
+
+# -------------------------
+# Reads
+# -------------------------
+def _rows_to_dicts(conn: sqlite3.Connection, rows: List[sqlite3.Row], include_text: bool) -> List[Dict[str, Any]]:
+    # one skills query for the whole page instead of one per row
+    skills: Dict[str, Dict[str, List[str]]] = {row["id"]: {EXTRACTED: [], MATCHED: [], MISSING: [], JD: []} for row in rows}
+    if rows:
+        marks = ",".join("?" * len(rows))
+        for s in conn.execute(
+            f"SELECT analysis_id, skill, kind FROM analysis_skills WHERE analysis_id IN ({marks}) ORDER BY skill",
+            [row["id"] for row in rows],
+        ):
+            skills[s["analysis_id"]][s["kind"]].append(s["skill"])
+
+    out = []
+    for row in rows:
+        item = {
+            "id": row["id"],
+            "filename": row["filename"],
+            "jd_id": row["jd_id"],
+            "profile": row["profile"],
+            "match_score": row["score"],
+            "breakdown": json.loads(row["breakdown"]),
+            "suggestions": json.loads(row["suggestions"]),
+            "extracted_skills": skills[row["id"]][EXTRACTED],
+            "matched_skills": skills[row["id"]][MATCHED],
+            "missing_skills": skills[row["id"]][MISSING],
+            "job_description_skills": skills[row["id"]][JD],
+            "resume_hash": row["resume_hash"],
+            "created_at": row["created_at"],
+        }
+        if include_text:
+            item["resume_text"] = get_resume_text(row["resume_hash"], conn=conn)
+        out.append(item)
+    return out
+
+
+def get_resume_text(content_hash: Optional[str], conn: Optional[sqlite3.Connection] = None) -> str:
+    if not content_hash:
+        return ""
+    own = conn is None
+    conn = conn or _connect()
+    try:
+        row = conn.execute(
+            "SELECT text_z FROM resume_texts WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+        return zlib.decompress(row["text_z"]).decode("utf-8") if row else ""
+    finally:
+        if own:
+            conn.close()
+
+
+def get_analysis(analysis_id: str, include_text: bool = True) -> Optional[Dict[str, Any]]:
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+        return _rows_to_dicts(conn, [row], include_text)[0] if row else None
+    finally:
+        conn.close()
+
+
+def query_analyses(
+    skills: Optional[List[str]] = None,
+    matched_skills: Optional[List[str]] = None,
+    missing_skills: Optional[List[str]] = None,
+    profile: Optional[str] = None,
+    min_score: Optional[int] = None,
+    max_score: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    include_text: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Query stored analyses, best score first.
+
+    Args:
+        skills: resume text must contain all of these skills
+        matched_skills: all of these JD skills were matched by embeddings only (not literally)
+        missing_skills: analysis must report all of these skills as missing
+        profile: only analyses from this pipeline profile ("fast" / "full");
+            scores of different profiles are not comparable
+        min_score / max_score: inclusive score bounds (0-100)
+        since / until: ISO timestamps bounding created_at
+        limit / offset: paging
+        include_text: also load the (deduplicated) resume text
+
+    Example: top 50 candidates with python and score > 70
+        query_analyses(skills=["python"], profile="full", min_score=71, limit=50)
+    """
+    where = []
+    params: List[Any] = []
+    for kind, values in ((EXTRACTED, skills), (MATCHED, matched_skills), (MISSING, missing_skills)):
+        for skill in _skills(values):
+            where.append(
+                "a.id IN (SELECT analysis_id FROM analysis_skills WHERE kind = ? AND skill = ?)"
+            )
+            params += [kind, skill]
+    if profile:
+        where.append("a.profile = ?")
+        params.append(profile)
+    if min_score is not None:
+        where.append("a.score >= ?")
+        params.append(int(min_score))
+    if max_score is not None:
+        where.append("a.score <= ?")
+        params.append(int(max_score))
+    if since:
+        where.append("a.created_at >= ?")
+        params.append(since)
+    if until:
+        where.append("a.created_at <= ?")
+        params.append(until)
+
+    sql = "SELECT a.* FROM analyses a"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY a.score DESC, a.created_at DESC LIMIT ? OFFSET ?"
+    params += [int(limit), int(offset)]
+
+    conn = _connect()
+    try:
+        return _rows_to_dicts(conn, conn.execute(sql, params).fetchall(), include_text)
+    finally:
+        conn.close()
+
+
+# -------------------------
+# Import (when run directly)
+# -------------------------
+if __name__ == "__main__":
+    import sys
+
+    dirs = sys.argv[1:] or ["analyses"]
+    print(f"imported {import_json_dir(*dirs)} analyses into {_db_path()}")
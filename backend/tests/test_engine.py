@@ -0,0 +1,123 @@
+# backend/tests/test_engine.py
+"""
+Stage-graph pipeline engine: planning, scheduling, profiles and error cases.
+"""
+
+import threading
+
+import pytest
+
+from backend.app.pipeline.engine import Pipeline, PipelineError, Stage
+
+
+def _const(**outputs):
+    return lambda inp: dict(outputs)
+
+
+def test_runs_stages_in_dependency_order():
+    pipeline = Pipeline(
+        [
+            Stage("double", lambda inp: {"b": inp["a"] * 2}, inputs=["a"], outputs=["b"]),
+            Stage("inc", lambda inp: {"c": inp["b"] + 1}, inputs=["b"], outputs=["c"]),
+        ],
+        profiles=["default"],
+    )
+    ctx = pipeline.run({"a": 3}, "default")
+    assert ctx["c"] == 7
+    assert set(ctx["timings"]) == {"double", "inc"}
+
+
+def test_independent_stages_run_concurrently():
+    # each stage waits for the other; this only completes if both run at once
+    barrier = threading.Barrier(2, timeout=5)
+
+    def stage(key):
+        def func(inp):
+            barrier.wait()
+            return {key: True}
+        return func
+
+    pipeline = Pipeline(
+        [
+            Stage("left", stage("l"), inputs=["x"], outputs=["l"]),
+            Stage("right", stage("r"), inputs=["x"], outputs=["r"]),
+            Stage("join", lambda inp: {"done": inp["l"] and inp["r"]}, inputs=["l", "r"], outputs=["done"]),
+        ],
+        profiles=["default"],
+    )
+    assert pipeline.run({"x": 1}, "default")["done"] is True
+
+
+def test_profiles_skip_stages_and_optional_inputs():
+    seen = {}
+
+    def scoring(inp):
+        seen.update(inp)
+        return {"score": 1}
+
+    pipeline = Pipeline(
+        [
+            Stage("semantic", _const(semantic=0.5), inputs=["x"], outputs=["semantic"], profiles=["full"]),
+            Stage("scoring", scoring, inputs=["x"], optional_inputs=["semantic"], outputs=["score"]),
+        ],
+        profiles=["fast", "full"],
+    )
+
+    ctx = pipeline.run({"x": 1}, "fast")
+    assert "semantic" not in ctx and "semantic" not in seen
+
+    ctx = pipeline.run({"x": 1}, "full")
+    assert ctx["semantic"] == 0.5 and seen["semantic"] == 0.5
+
+
+def test_unknown_profile():
+    pipeline = Pipeline([Stage("a", _const(a=1), outputs=["a"])], profiles=["default"])
+    with pytest.raises(PipelineError, match="unknown profile"):
+        pipeline.run({}, "other")
+
+
+def test_missing_input_is_rejected_before_running():
+    ran = []
+    pipeline = Pipeline(
+        [
+            Stage("first", lambda inp: ran.append("first") or {"a": 1}, outputs=["a"]),
+            Stage("needs_full", _const(b=1), inputs=["semantic"], outputs=["b"]),
+            Stage("semantic", _const(semantic=1), outputs=["semantic"], profiles=["full"]),
+        ],
+        profiles=["fast", "full"],
+    )
+    with pytest.raises(PipelineError, match="needs semantic"):
+        pipeline.run({}, "fast")
+    assert ran == []
+
+
+def test_duplicate_producer():
+    with pytest.raises(PipelineError, match="produced by both"):
+        Pipeline([Stage("a", _const(x=1), outputs=["x"]), Stage("b", _const(x=2), outputs=["x"])], profiles=["p"])
+
+
+def test_stage_must_produce_declared_outputs():
+    pipeline = Pipeline([Stage("a", _const(), outputs=["x"])], profiles=["p"])
+    with pytest.raises(PipelineError, match="did not produce x"):
+        pipeline.run({}, "p")
+
+
+def test_cycle_is_detected():
+    pipeline = Pipeline(
+        [
+            Stage("a", _const(a=1), inputs=["b"], outputs=["a"]),
+            Stage("b", _const(b=1), inputs=["a"], outputs=["b"]),
+        ],
+        profiles=["p"],
+    )
+    with pytest.raises(PipelineError, match="cannot be scheduled"):
+        pipeline.run({}, "p")
+
+
+def test_stage_errors_propagate():
+    def boom(inp):
+        raise ValueError("boom")
+
+    pipeline = Pipeline([Stage("a", boom, outputs=["a"])], profiles=["p"])
+    with pytest.raises(ValueError, match="boom"):
+        pipeline.run({}, "p")
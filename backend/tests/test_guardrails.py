@@ -0,0 +1,146 @@
+# backend/tests/test_guardrails.py
+"""
+Upload guardrails: pre-flight checks, the parse timeout and the request body limit.
+No parser or embedding model is needed.
+"""
+
+import time
+import zipfile
+import zlib
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend.app.main import BodySizeLimitMiddleware
+from backend.app.parser import guardrails
+from backend.app.parser.guardrails import ParseTimeout, UploadRejected, preflight_check, run_with_timeout
+
+
+def _pdf(body: bytes) -> bytes:
+    return b"%PDF-1.7\n" + body + b"\ntrailer << /Size 10 >>\n%%EOF\n"
+
+
+def _write(tmp_path, name: str, data: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+# -------------------------
+# PDF
+# -------------------------
+def test_pdf_within_limits(tmp_path):
+    path = _write(tmp_path, "ok.pdf", _pdf(b"1 0 obj << /Type /Page >> endobj\n" * 2))
+    assert preflight_check(path)["pages"] == 2
+
+
+def test_pdf_too_many_pages(tmp_path):
+    body = b"1 0 obj << /Type /Page >> endobj\n" * (guardrails.MAX_PDF_PAGES + 1)
+    path = _write(tmp_path, "big.pdf", _pdf(body))
+    with pytest.raises(UploadRejected) as exc:
+        preflight_check(path)
+    assert exc.value.status_code == 413
+
+
+def test_pdf_pages_counted_in_object_streams(tmp_path):
+    pages = zlib.compress(b"<< /Type /Page >>\n" * (guardrails.MAX_PDF_PAGES + 1))
+    body = b"5 0 obj << /Type /ObjStm /Filter /FlateDecode >>\nstream\n" + pages + b"\nendstream\nendobj"
+    path = _write(tmp_path, "objstm.pdf", _pdf(body))
+    with pytest.raises(UploadRejected):
+        preflight_check(path)
+
+
+def test_pdf_too_many_objects(tmp_path):
+    path = _write(tmp_path, "objs.pdf", b"%PDF-1.7\ntrailer << /Size " + str(guardrails.MAX_PDF_OBJECTS + 1).encode() + b" >>")
+    with pytest.raises(UploadRejected):
+        preflight_check(path)
+
+
+def test_not_a_pdf(tmp_path):
+    path = _write(tmp_path, "fake.pdf", b"hello")
+    with pytest.raises(UploadRejected) as exc:
+        preflight_check(path)
+    assert exc.value.status_code == 422
+
+
+# -------------------------
+# DOCX / zip containers
+# -------------------------
+def _zip(path: str, size: int) -> None:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("word/document.xml", b"\0" * size)
+
+
+def test_docx_within_limits(tmp_path):
+    path = str(tmp_path / "ok.docx")
+    _zip(path, 1000)
+    assert preflight_check(path)["parts"] == 1
+
+
+@pytest.mark.parametrize("name", ["bomb.docx", "bomb.doc", "bomb.bin"])
+def test_zip_bomb_rejected_by_content(tmp_path, name):
+    path = str(tmp_path / name)
+    _zip(path, 4 * 1024 * 1024)
+    with pytest.raises(UploadRejected) as exc:
+        preflight_check(path)
+    assert exc.value.status_code == 413
+
+
+def test_file_too_large(tmp_path, monkeypatch):
+    monkeypatch.setattr(guardrails, "MAX_UPLOAD_BYTES", 10)
+    path = _write(tmp_path, "resume.txt", b"x" * 11)
+    with pytest.raises(UploadRejected):
+        preflight_check(path)
+
+
+# -------------------------
+# Parse timeout
+# -------------------------
+def test_run_with_timeout_returns_result():
+    assert run_with_timeout(len, ("abc",), timeout=30) == 3
+
+
+def test_run_with_timeout_kills_slow_call():
+    start = time.monotonic()
+    with pytest.raises(ParseTimeout):
+        run_with_timeout(time.sleep, (30,), timeout=0.5)
+    assert time.monotonic() - start < 10
+
+
+def test_run_with_timeout_reports_errors():
+    with pytest.raises(RuntimeError, match="parsing failed"):
+        run_with_timeout(int, ("not a number",), timeout=30)
+
+
+# -------------------------
+# Request body limit
+# -------------------------
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=100)
+    return TestClient(app)
+
+
+def test_body_within_limit(client):
+    resp = client.post("/echo", content=b"x" * 100)
+    assert resp.status_code == 200
+    assert resp.json() == {"size": 100}
+
+
+def test_body_rejected_by_content_length(client):
+    assert client.post("/echo", content=b"x" * 101).status_code == 413
+
+
+def test_chunked_body_rejected_while_received(client):
+    def chunks():
+        for _ in range(5):
+            yield b"x" * 50
+
+    assert client.post("/echo", content=chunks()).status_code == 413
@@ -0,0 +1,55 @@
+# backend/tests/test_stages.py
+"""
+The fast analysis profile end to end, on a plain-text resume (no models needed).
+"""
+
+import pytest
+
+from backend.app.pipeline import stages
+from backend.app.pipeline.engine import PipelineError
+from backend.app.scorer import scoring_model
+
+RESUME = """Jane Doe
+Experience
+5 years building JavaScript and Python services, CI/CD pipelines and machine learning models.
+Education
+BSc Computer Science
+Skills
+python, javascript, docker
+"""
+
+JD = "We need a Python engineer with Java, machine learning, CI/CD and Kubernetes experience."
+
+
+@pytest.fixture
+def resume_path(tmp_path, monkeypatch):
+    def no_model():
+        raise AssertionError("fast profile must not load the embedding model")
+
+    monkeypatch.setattr(scoring_model, "get_embed_model", no_model)
+    path = tmp_path / "resume.txt"
+    path.write_text(RESUME, encoding="utf-8")
+    return str(path)
+
+
+def test_fast_profile(resume_path):
+    result = stages.run_analysis(resume_path, jd_text=JD, profile=stages.FAST)
+
+    assert result["profile"] == "fast"
+    assert result["skill_gap"]["method"] == "literal"
+    assert set(result["job_description_skills"]) == {"python", "java", "machine learning", "ci/cd", "kubernetes"}
+    # whole-token matching: "JavaScript" is not "java"
+    assert set(result["matched_skills"]) == {"python", "machine learning", "ci/cd"}
+    assert set(result["missing_skills"]) == {"java", "kubernetes"}
+    assert "java" not in result["extracted_skills"]
+
+    # only the components of the fast score
+    breakdown = result["breakdown"]
+    assert set(breakdown) == {"skill_score", "experience_score", "title_score", "format_score", "match_score"}
+    assert breakdown["match_score"] == result["final_score"]
+    assert set(result["timings_ms"]) == {"extract", "jd", "skills", "scoring"}
+
+
+def test_unknown_profile(resume_path):
+    with pytest.raises(PipelineError):
+        stages.run_analysis(resume_path, profile="turbo")